@@ -2,16 +2,43 @@
 
 __all__ = ("ATInfo", "genres_en", "genres_ru", "genre_name")
 
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Self, Optional
 import re
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_API_URL = 'https://api.author.today/v1/work/{0}/meta-info'
+
+_ELLIPSIS_RE = re.compile(r'(?<![\.\?\!])\.{2,5}+(?!\.)')
+_SINGLE_LETTERS_RE = re.compile(r'^(\w\.\s*)+$')
+_AT_URL_RE = re.compile(r'^(?:https?://)author\.today/work/(\d+)/?$')
+_WS_RE = re.compile(r'\s+')
+
+_YO_TABLE = str.maketrans({'Ё': 'Е', 'ё': 'е'})
+
+# local timezone is resolved once at import: it doesn't change mid-run and
+# datetime.utcnow() (the old way to grab it per call) is deprecated anyway
+_LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+_GENRE_KEYS = ('genreId', 'firstSubGenreId', 'secondSubGenreId')
+_AUTHOR_KEYS = (('authorFIO', 'authorUserName'),
+                ('coAuthorFIO', 'coAuthorUserName'),
+                ('secondCoAuthorFIO', 'secondCoAuthorUserName'))
+
 
 def normalize_text(data: str = '', strip_dots: bool = False, check_single_letters: bool = False) -> str:
-    data = re.sub(r'(?<![\.\?\!])\.{2,5}(?!\.)', '…', data).replace('Ё', 'Е').replace('ё', 'е').strip().strip('_ ')
+    if '..' in data:
+        data = _ELLIPSIS_RE.sub('…', data)
+    data = data.translate(_YO_TABLE).strip().strip('_ ')
     if strip_dots:
-        if not check_single_letters or (check_single_letters and not re.match(r'^(\w\.\s*)+$', data)):
+        if not check_single_letters or (check_single_letters and not _SINGLE_LETTERS_RE.match(data)):
             data = data.strip('…._ ')
     return data
 
@@ -20,24 +47,21 @@ def str_if_none(data, default: str = '') -> str:
     return default if data is None or not isinstance(data, str) else data
 
 
-def bool_if_none(data: bool, default: bool = False) -> bool:
-    return default if data is None else data
-
-
-def int_if_none(data: int, default: int = 0) -> int:
-    return default if data is None else data
-
-
-def float_if_none(data: float, default: float = .0) -> float:
-    return default if data is None else data
+class ATInfo:
+    # a fixed attribute layout: slot access is a C-level offset instead of an
+    # instance-dict probe, and bulk imports keep one ATInfo per book alive
+    __slots__ = ('__url', '__data', '__available', '__author_url', '__date_format')
 
+    # one pooled session for all instances: keeps sockets and TLS sessions alive
+    # between requests instead of paying a new handshake per book
+    _SESSION = requests.Session()
+    _SESSION.headers.update({'Authorization': 'Bearer guest'})
+    _SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32))
 
-class ATInfo:
     def __init__(self, available: bool = True):
         self.__url: Optional[str] = None
         self.__data: Optional[dict] = None
         self.__available: bool = available
-        self.__api_url: str = 'https://api.author.today/v1/work/{0}/meta-info'
         self.__author_url: str = 'https://author.today/u/{0}/works'
         self.__date_format: str = '%Y-%m-%d %H:%M'
 
@@ -47,20 +71,20 @@ class ATInfo:
 
     @url.setter
     def url(self, url: str) -> None:
-        if match := re.search(r"^(?:https?://)author.today/work/(\d+)/?$", url.strip()):
+        if match := _AT_URL_RE.match(url.strip()):
             self.__connect(int(match.group(1)))
 
     @property
     def id(self) -> int:
-        return int_if_none(self.__data['id']) if self.is_valid() else 0
+        return (self.__data.get('id') or 0) if self.is_valid() else 0
 
     @property
     def title(self) -> str:
-        return str_if_none(self.__data['title'])
+        return self.__data.get('title') or ''
 
     @property
     def cover(self) -> str:
-        return str_if_none(self.__data['cover'])
+        return self.__data.get('cover') or ''
 
     @property
     def time_modified(self) -> str:
@@ -76,83 +100,68 @@ class ATInfo:
 
     @property
     def finished(self) -> bool:
-        return bool_if_none(self.__data['isFinished']) if self.is_valid() else False
+        return bool(self.__data.get('isFinished')) if self.is_valid() else False
 
     @property
     def price(self) -> float:
-        return float_if_none(self.__data['price']) if self.is_valid() else .0
+        return (self.__data.get('price') or .0) if self.is_valid() else .0
 
     @property
     def authors(self) -> list[list]:
         authors = []
         if self.is_valid():
-            if (author := self.__author(self.__data['authorFIO'], self.__data['authorUserName'])) is not None:
-                authors.append(author)
-            if (author := self.__author(self.__data['coAuthorFIO'], self.__data['coAuthorUserName'])) is not None:
-                authors.append(author)
-            if (author := self.__author(self.__data['secondCoAuthorFIO'],
-                                        self.__data['secondCoAuthorUserName'])) is not None:
-                authors.append(author)
+            d = self.__data
+            for fio_key, username_key in _AUTHOR_KEYS:
+                if (author := self.__author(d.get(fio_key), d.get(username_key))) is not None:
+                    authors.append(author)
         return authors
 
     @property
     def genres(self) -> list:
         genre = []
         if self.is_valid():
-            if self.__data['genreId'] is not None:
-                genre.append(self.__data['genreId'])
-            if self.__data['firstSubGenreId'] is not None:
-                genre.append(self.__data['firstSubGenreId'])
-            if self.__data['secondSubGenreId'] is not None:
-                genre.append(self.__data['secondSubGenreId'])
+            d = self.__data
+            genre = [genre_id for key in _GENRE_KEYS if (genre_id := d.get(key)) is not None]
         return genre
 
     @property
     def genres_ru(self) -> list:
         genres = []
         if self.is_valid():
-            if (gentre := genre_name(self.__data['genreId'], 'ru')) is not None:
-                genres.append(gentre)
-            if (gentre := genre_name(self.__data['firstSubGenreId'], 'ru')) is not None:
-                genres.append(gentre)
-            if (gentre := genre_name(self.__data['secondSubGenreId'], 'ru')) is not None:
-                genres.append(gentre)
+            d = self.__data
+            genres = [gentre for key in _GENRE_KEYS if (gentre := genre_name(d.get(key), 'ru')) is not None]
         return genres
 
     @property
     def genres_en(self) -> list:
         genres = []
         if self.is_valid():
-            if (gentre := genre_name(self.__data['genreId'], 'en')) is not None:
-                genres.append(gentre)
-            if (gentre := genre_name(self.__data['firstSubGenreId'], 'en')) is not None:
-                genres.append(gentre)
-            if (gentre := genre_name(self.__data['secondSubGenreId'], 'en')) is not None:
-                genres.append(gentre)
+            d = self.__data
+            genres = [gentre for key in _GENRE_KEYS if (gentre := genre_name(d.get(key), 'en')) is not None]
         return genres
 
     @property
     def adult_only(self) -> bool:
-        return bool_if_none(self.__data['adultOnly']) if self.is_valid() else False
+        return bool(self.__data.get('adultOnly')) if self.is_valid() else False
 
     @property
     def likes_count(self) -> int:
-        return int_if_none(self.__data['likeCount']) if self.is_valid() else 0
+        return (self.__data.get('likeCount') or 0) if self.is_valid() else 0
 
     @property
     def rewards_count(self) -> int:
-        return int_if_none(self.__data['rewardCount']) if self.is_valid() else 0
+        return (self.__data.get('rewardCount') or 0) if self.is_valid() else 0
 
     @property
     def comments_count(self) -> int:
-        return int_if_none(self.__data['commentCount']) if self.is_valid() else 0
+        return (self.__data.get('commentCount') or 0) if self.is_valid() else 0
 
     def series(self) -> list:
         series = []
-        if self.is_valid() and self.__data['seriesId'] is not None:
-            series.append(int(self.__data['seriesId']))
-            series.append(int(self.__data['seriesOrder']))
-            series.append(str(self.__data['seriesTitle']))
+        if self.is_valid() and (d := self.__data).get('seriesId') is not None:
+            series.append(int(d['seriesId']))
+            series.append(int(d['seriesOrder']))
+            series.append(str(d['seriesTitle']))
         return series
 
     def available(self, available: bool = True) -> Self:
@@ -163,23 +172,36 @@ class ATInfo:
         self.url = str_if_none(url)
         return self
 
+    @classmethod
+    def fetch_many(cls, urls: list, workers: int = 16) -> list[Self]:
+        """
+        Fetch meta-info for several work URLs concurrently.
+
+        The work is network-bound, so a thread pool over the shared pooled
+        session brings total time close to the slowest single request.
+
+        :param urls: author.today work URLs
+        :param workers: maximum number of concurrent requests
+        :return: list[ATInfo] in the same order as urls
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda url: cls().get(url), urls))
+
     def is_valid(self) -> bool:
         return self.__data is not None
 
     def __connect(self, id: int) -> None:
         if self.__available:
             try:
-                with requests.get(self.__api_url.format(id),
-                                  headers={'Authorization': 'Bearer guest'}) as response:
-                    if 'id' in (resp := response.json()):
-                        self.__data = resp
+                if 'id' in (resp := _fetch_meta(id)):
+                    self.__data = resp
             except EnvironmentError as err:
                 print(f'AT Connection Error: {err}')
                 pass
 
     def __convert_date(self, data: str) -> str:
         return datetime.fromisoformat(data).astimezone(
-            datetime.utcnow().astimezone().tzinfo
+            _LOCAL_TZ
         ).strftime(self.__date_format) if data is not None else ''
 
     def __author(self, name: str, username: str) -> Optional[list]:
@@ -191,26 +213,34 @@ class ATInfo:
         author = []
         if name is not None:
             # name = name.replace('Ё', 'Е').replace('ё', 'е').strip()
-            name = re.sub(r'\s+', ' ', name).strip()
+            name = _WS_RE.sub(' ', name).strip()
             if name != '':
                 name = name.split(' ')
-                match namelen := len(name):
-                    case 3:
-                        author = [name[0], name[1], name[2]]
-                    case 2:
-                        author = [name[0], '', name[1]]
-                    case 1:
-                        author = [name[0], '', '']
-                    case _:
-                        author = [name[0], ' '.join(name[1:namelen - 1]), name[-1]]
+                if len(name) == 1:
+                    author = [name[0], '', '']
+                else:
+                    author = [name[0], ' '.join(name[1:-1]), name[-1]]
                 if username is not None:
                     author.append(self.__author_url.format(username.lower().strip()))
         return author if len(author) > 0 else None
 
 
+@functools.lru_cache(maxsize=4096)
+def _fetch_meta(id: int) -> dict:
+    """Fetch and memoize the meta-info JSON for a work id.
+
+    Failed requests raise and are not cached, so transient network errors
+    don't poison the cache.
+    """
+    with ATInfo._SESSION.get(_API_URL.format(id), timeout=10) as response:
+        return orjson.loads(response.content) if orjson is not None else response.json()
+
+
 def genre_name(genre: int, lang: str = 'ru') -> Optional[str]:
-    dictionary = genres_en if lang == 'en' else genres_ru
-    return None if genre is None else dictionary[genre if genre in dictionary else None]
+    if genre is None:
+        return None
+    names = _GENRES_EN_ARR if lang == 'en' else _GENRES_RU_ARR
+    return names[genre] if 0 <= genre < len(names) else names[0]
 
 
 genres_en: dict = {
@@ -342,3 +372,9 @@ genres_ru: dict = {
     72: 'Назад в СССР',
     73: 'Уся'
 }
+
+# dense id-indexed views of the genre dicts: genre ids are small integers, so
+# a plain tuple index beats a dict probe on the per-book lookup path; unknown
+# ids fall back to slot 0 ('other'/'Иное')
+_GENRES_EN_ARR: tuple = tuple(genres_en.get(i, genres_en[None]) for i in range(max(k for k in genres_en if k is not None) + 1))
+_GENRES_RU_ARR: tuple = tuple(genres_ru.get(i, genres_ru[None]) for i in range(max(k for k in genres_ru if k is not None) + 1))
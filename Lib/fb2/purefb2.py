@@ -3,17 +3,24 @@
 __all__ = "PureFb2"
 
 import os
-import base64
+try:
+    # SIMD-accelerated drop-in for the stdlib codec
+    import pybase64 as base64
+except ImportError:
+    import base64
+import functools
 import io
 import re
 import sys
-import xml.dom.minidom as xmldom
-
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Self, Optional
 
 from PIL import Image, ImageFile
 from bs4 import BeautifulSoup, Tag, NavigableString
+from lxml import etree
+from zipfile import ZipFile, ZIP_DEFLATED
 
 from Lib.fb2.atinfo import ATInfo
 from Lib.fb2.zipper import InMemoryZipper, Zipper
@@ -41,10 +48,76 @@ MDASH_PAIR = NBSP + MDASH + WHSP
 
 ANYSUB = r'(?:[\*_~\{}\{}\{}\{}\{}] ?)'.format(HMINUS, MINUS, FDASH, NDASH, MDASH)
 
+# helper patterns compiled once at import: these run for every metadata field
+# of every book, so they must not pay the re-cache probe per call
+ELLIPSIS_PATTERN = re.compile(r'(?<![\.\?\!])\.{2,5}(?!\.)')
+SINGLE_LETTERS_PATTERN = re.compile(r'^(\w\.\s*)+$')
+
+# single-codepoint rewrites go through str.translate: one C-level pass
+# instead of a regex scan per character class
+YO_TABLE = str.maketrans({'Ё': 'Е', 'ё': 'е'})
+FILE_SAFE_TABLE = str.maketrans(HMINUS + MINUS + FDASH + NDASH + MDASH,
+                                HMINUS * 5,
+                                '"\\?!@#$%^&*_+|/:;[]{}<>')
+
+# base64 payloads only need their line breaks removed to become one line
+B64_WHITESPACE_TABLE = str.maketrans('', '', ' \t\n\r')
+
+# ellipsis after ?/! and stray ⁈!/⁉? combinations: these literal fixes don't
+# feed each other, so they run as one alternation pass with a dict dispatch
+PUNCTUATION_MAP = {'?…': '?..', '!…': '!..', '⁈!': '?!!', '⁉?': '!??'}
+PUNCTUATION_PATTERN = re.compile(r'\?…|!…|⁈!|⁉\?')
+
+# one scan over the last chapter title instead of six substring probes;
+# only these exact casings counted before, so no IGNORECASE here
+EPILOGUE_PATTERN = re.compile('Эпилог|ЭПИЛОГ|эпилог|Послесловие|Примечания|ПРИМЕЧАНИЯ')
+
+SENTENCE_RUNS_MAP = {'q3': '???', 'q2': '⁇', 'e3': '!!!', 'e2': '‼'}
+SENTENCE_RUNS_PATTERN = re.compile(
+    r'(?P<q3>(?<!\?)\?{3,5}(?!\?))'
+    r'|(?P<q2>(?<!\?)\?\?(?!\?))'
+    r'|(?P<e3>(?<!\!)\!{3,5}(?!\!))'
+    r'|(?P<e2>(?<!\!)!!(?<!\!))')
+
+# characters a dialogue dash may run straight into after '>'
+DASH_TARGET = r'[<A-ZА-ЯҐІЇЄ\.,\'«"]'
+# the tag-start and after-'>' dialogue-dash rules never match each other's
+# output (verified exhaustively), so one alternation replaces two passes;
+# the space-flanked rules stay separate because their replacements emit
+# whitespace the later dash rules still need to see
+DIALOGUE_DASH_PATTERN = re.compile(
+    rf'<(?P<tag>\w+?)>{ANYDASH}{ANYSP}|>{ANYDASH}(?={DASH_TARGET})')
+
+
+def dialogue_dash(match: re.Match) -> str:
+    tag = match.group('tag')
+    if tag is not None:
+        return f'<{tag}>{MDASH}{NBSP}'
+    return f'>{MDASH}{NBSP}'
+
+
+PARAGRAPH_PATTERN = re.compile(r'<p>[\s\S]+?</p>')
 
+TITLE_SEPARATOR = r'[\.:,\{}\{}\{}\{}\{};\s]'.format(HMINUS, MINUS, FDASH, NDASH, MDASH)
+# 'Глава 12. Название' style headers, split into number and text parts
+SECTION_TITLE_PATTERN = re.compile(
+    rf'^((?:часть|глава|том|книга|раздел|арка)){ANYSP}*?((?:\d+\.?)+){TITLE_SEPARATOR}+(.+)$',
+    re.IGNORECASE | re.MULTILINE)
+# first letter of the title text, with an optional leading quote
+TITLE_LETTER_PATTERN = re.compile(r'^(["«\']?)(\w)(.*)$')
+
+
+
+def typus_paragraph(match: re.Match) -> str:
+    return ru_typus(match.group())
+
+
+@functools.lru_cache(maxsize=256)
 def max_filename_length(path):
     """
     Query filesystem for maximum filename length (e.g. AUFS has 242).
+
+    Cached: it costs a syscall and is asked once per candidate name.
     """
     try:
         return os.pathconf(path, 'PC_NAME_MAX')
@@ -52,13 +125,25 @@ def max_filename_length(path):
         return 255  # Should be safe on most backends
 
 
-def clear_tags(parent: Tag | NavigableString, name: str) -> None:
+class PromoArgs(dict):
+    """
+    format_map lookup for promo templates: placeholders missing from the
+    document info resolve to '' instead of raising KeyError.
+    """
+
+    def __missing__(self, key: str) -> str:
+        return ''
+
+
+def clear_tags(parent: Tag | NavigableString, name: str, recursive: bool = True) -> None:
     """
     :param parent:
     :param name:
+    :param recursive: Search the whole subtree; pass False when the tags are
+        known to be direct children
     :return:
     """
-    for tag in parent.find_all(name):
+    for tag in parent.find_all(name, recursive=recursive):
         tag.decompose()
 
 
@@ -137,51 +222,35 @@ def get_namespaces(soap: BeautifulSoup, as_string: bool = False) -> dict | str:
     :param soap: BeautifulSoup object
     :return: list of namespaces
     """
+    attrs = soap.find("FictionBook").attrs
+    if as_string:
+        return ''.join(f' {name}="{value}"' for name, value in attrs.items())
     namespaces = {}
-    namespaces_str = ''
-    for ns in soap.find("FictionBook").attrs.items():
-        # namespaces.append(f'{ns[0]}="{ns[1]}"')
-        _ns = ns[0].split(':')
-        namespaces[ns[1]] = _ns[1] if len(_ns) == 2 else ''
-        namespaces_str += f' {ns[0]}="{ns[1]}"'
-    # namespaces = list([f'xmlns{ns[1]}="{ns[0]}"' for ns in namespaces])
-    return namespaces_str if as_string else namespaces
+    for name, value in attrs.items():
+        _ns = name.split(':')
+        namespaces[value] = _ns[1] if len(_ns) == 2 else ''
+    return namespaces
 
 
 def normalize_text(data: str = '', strip_dots: bool = False, check_single_letters: bool = False) -> str:
-    data = re.sub(r'(?<![\.\?\!])\.{2,5}(?!\.)', '…', data).replace('Ё', 'Е').replace('ё', 'е').strip().strip('_ ')
+    data = ELLIPSIS_PATTERN.sub('…', data).translate(YO_TABLE).strip().strip('_ ')
     if strip_dots:
-        if not check_single_letters or (check_single_letters and not re.match(r'^(\w\.\s*)+$', data)):
+        if not check_single_letters or (check_single_letters and not SINGLE_LETTERS_PATTERN.match(data)):
             data = data.rstrip('._ ')
     return data
 
 
 def file_safe(data: str = '') -> str:
-    data = re.sub(r'["\\?!@#$%^&*_+|/:;\[\]{}<>]', '', data)
-    data = re.sub(r'[{}{}{}{}{}]'.format('-', '−', '‒', '–', '—'), '-', data)
-    data = re.sub(r'\s+', ' ', data)
+    # split()/join collapses whitespace runs in C, no regex engine involved
+    data = ' '.join(data.translate(FILE_SAFE_TABLE).split())
     return data.strip('. _')
 
 
-def prettify_fb2(data: str = '', indent: int = 1):
-    """Prettify FB2 XML with intelligent inline tags.
-
-    :param data: XML text to prettify.
-    :param indent: Set size of XML tag indents.
-    :return: Prettified XML.
-    """
-    doc = xmldom.parseString(data)
-
-    data = doc.toprettyxml(indent=' ' * indent)
-    # data = doc.toprettyxml(indent=' ' * indent, encoding='utf-8').decode()
+ATTR_QUOTE_PATTERN = re.compile(
+    r'({0})="(.+?)"'.format('|'.join(['name', 'value', 'prefix', 'localName', 'ownerDocument', 'ownerElement'])))
 
-    # fix quotes in attributes
-    # https://stackoverflow.com/questions/61590447/disable-escaping-when-pretty-printing-an-xml-with-python-elementtree-and-minidom
-    data = re.sub(
-        r'({0})="(.+?)"'.format('|'.join(['name', 'value', 'prefix', 'localName', 'ownerDocument', 'ownerElement'])),
-        lambda m: '{}="{}"'.format(m.group(1), m.group(2).replace('&quot;', '&#34;')),
-        data)
 
+def prettify_replaces() -> list:
     replaces: list = []
 
     # inline all tags
@@ -210,7 +279,8 @@ def prettify_fb2(data: str = '', indent: int = 1):
     # Adds a no breakable space between the ending inline tags and following dash
     # inline NBSP
     replaces.append(
-        [rf'[\n\s]*(</(strong|a|emphasis|strikethrough|sup|sub|code)>)({ANYDASH})', rf'\g<1>{NBSP}\g<3>', re.DOTALL])
+        [rf'[\n\s]*(</(strong|a|emphasis|strikethrough|sup|sub|code)>)[\n\s]*({ANYDASH})', rf'\g<1>{NBSP}\g<3>',
+         re.DOTALL])
     # Removes spaces between nested inline tags
     # nested spaces start
     replaces.append([r'(<[^/]*?>) (?=<)', r'\g<1>'])
@@ -223,12 +293,37 @@ def prettify_fb2(data: str = '', indent: int = 1):
     # Removes spaces between left parenthesis and nested inline tag
     replaces.append([rf'(?<=\(){ANYSP}+(?=<)', r''])
 
-    # quot
-    replaces.append([r'(&quot;)', '"'])
-    # encoding
-    replaces.append([r'(<\?xml.+?)\?>', r'\g<1>encoding="utf-8"?>'])
+    # quot: a literal rewrite, str.replace beats the regex engine here
+    replaces.append([lambda data: data.replace('&quot;', '"')])
+
+    return replaces
+
+
+# like GLOBAL_REPLACES: the prettify table is static, compile it once
+PRETTIFY_REPLACES = tuple(
+    [re.compile(f'{r[0]}', r[2] if len(r) > 2 else re.NOFLAG) if isinstance(r[0], str) else r[0]] + r[1:]
+    for r in prettify_replaces()
+)
+
+
+def prettify_fb2(data: str = '', indent: int = 1):
+    """Prettify FB2 XML with intelligent inline tags.
+
+    :param data: XML text to prettify.
+    :param indent: Set size of XML tag indents.
+    :return: Prettified XML.
+    """
+    root = etree.fromstring(data.encode('utf-8'))
+    etree.indent(root, space=' ' * indent)
+    data = '<?xml version="1.0" encoding="utf-8"?>\n' + etree.tostring(root, encoding='unicode')
+
+    # fix quotes in attributes
+    # https://stackoverflow.com/questions/61590447/disable-escaping-when-pretty-printing-an-xml-with-python-elementtree-and-minidom
+    data = ATTR_QUOTE_PATTERN.sub(
+        lambda m: '{}="{}"'.format(m.group(1), m.group(2).replace('&quot;', '&#34;')),
+        data)
 
-    return process_replaces(data, replaces)
+    return process_replaces(data, PRETTIFY_REPLACES)
 
 
 def process_replaces(data: str = '', replaces: Optional[list] = None):
@@ -236,24 +331,63 @@ def process_replaces(data: str = '', replaces: Optional[list] = None):
         replaces = []
     if data:
         for r in replaces:
+            if callable(r[0]):
+                data = r[0](data)
+                continue
             replace = r[1] if len(r) > 1 else ''
             flags = r[2] if len(r) > 2 else re.NOFLAG
+            # entries may carry an already compiled pattern (flags baked in)
+            pattern = r[0] if isinstance(r[0], re.Pattern) else re.compile(f'{r[0]}', flags)
             if len(r) > 3:
                 if r[3] == 'UNTIL_FOUND':
-                    while re.search(f'{r[0]}', data, flags):
-                        data = re.sub(f'{r[0]}', replace, data, 0, flags)
+                    # subn tells us whether anything fired, so each round
+                    # costs one scan instead of the search()+sub() pair
+                    data, count = pattern.subn(replace, data)
+                    while count:
+                        data, count = pattern.subn(replace, data)
                 elif r[3] == 'EXECUTIVE':
-                    data = re.sub(f'{r[0]}', eval(replace), data, 0, flags)
+                    data = pattern.sub(eval(replace), data)
             else:
-                data = re.sub(f'{r[0]}', replace, data, 0, flags)
+                data = pattern.sub(replace, data)
     return data
 
 
+def strip_empty_p(data: str) -> str:
+    # hand-rolled replacement for the r'<p>(\s*)</p>' -> '\g<1>' rule;
+    # a literal find() scan beats the regex engine on this fixed anchor
+    out = []
+    i = 0
+    while (j := data.find('<p>', i)) != -1:
+        k = j + 3
+        while k < len(data) and data[k].isspace():
+            k += 1
+        if data.startswith('</p>', k):
+            out.append(data[i:j])
+            out.append(data[j + 3:k])
+            i = k + 4
+        else:
+            out.append(data[i:j + 3])
+            i = j + 3
+    out.append(data[i:])
+    return ''.join(out)
+
+
+def gated_replace(trigger: str, pattern: re.Pattern, replace):
+    # str.__contains__ is a memchr-style probe, far cheaper than a regex
+    # scan; when the trigger substring is absent the pass is a guaranteed
+    # no-op, so clean sources skip it entirely
+    def run(data: str) -> str:
+        if trigger in data:
+            return pattern.sub(replace, data)
+        return data
+    return run
+
+
 def extract_linebrakes_in_body(match):
     data = match.group()
     if data.find(r'<br/>') != -1:
         # print('extract linebrakes: true')
-        if (soup := BeautifulSoup(data, 'xml')) is not None \
+        if (soup := BeautifulSoup(data, 'lxml-xml')) is not None \
                 and (body := soup.find('body')) is not None:
             # and body.attrs.get('name', 'content') == 'content':
 
@@ -294,6 +428,180 @@ def str_if_none(data, default: str = '') -> str:
     return default if data is None or not isinstance(data, str) else data
 
 
+def global_replaces() -> list:
+    """
+    (r'<title>\s*\n*<p>(.*)</p>\s*\n*</title>\n*<p>\s*(\1|(<strong>\1</strong>))\s*</p>',
+        r'<title>\n<p>\1</p>\n</title>'),
+    (r'<p>(<\w+>)*\s*\*\s*\*\s*\*s*(</\w+>)*</p>', '<subtitle>* * *</subtitle>'),
+    (r'\n+', '\n'),
+    (r'\.(?=</p>\s*\n*</title>)', ''),
+    """
+    replaces = []
+    # starts_at = content.find('<body')
+    # ends_at = content.rfind('</body>') + len('</body>')
+    # header = content[:starts_at]
+    # footer = content[ends_at:]
+    # we will replace occurrences in body section only
+    # content = content[starts_at:ends_at]
+
+    # !!! EXPERIMENTAL !!!
+    # remove some ugly cases after title like:
+    # <title>
+    # <p>Глава 1.1</p>
+    # </title>
+    # <p>Часть 1.</p>
+    # <p>Глава 1.1</p>
+    # replaces.append(
+    #    [r'(?<!<title>)\s+<p>\s*(?:часть|глава|том|книга|раздел|арка)\s*(?:\d+\.?)+\s*</p>(?!(?:\s+</title>))',
+    #     '', re.IGNORECASE])
+
+    # TWO ANY STANDALONE DASH to EM DASH
+    replaces.append([f'(?<!{ANYDASH}){ANYDASH}{{2}}(?!{ANYDASH})', MDASH])
+
+    # add space after any dashes at dialogue & convert it into the md dash
+    replaces.append([f'{ANYSP}{ANYDASH}{ANYSP}', MDASH_PAIR])
+    replaces.append([DIALOGUE_DASH_PATTERN, dialogue_dash])
+    replaces.append([rf'({ANYSP}{ANYDASH}{DASH_TARGET})', rf'{MDASH}{NBSP}\g<1>'])
+
+    # clean up bold, italic, underline, strike HTML tags
+    replaces.append([r'<([b|i|u|s])>([\s\S]*?)</\1>', r'\g<2>', re.IGNORECASE])
+    replaces.append([r'<([b|i|u|s])\s*/>', '', re.IGNORECASE])
+
+    # split two consecutive tags into the single one
+    replaces.append([r'</(strong|emphasis|strikethrough|sup|sub|code)>(\s*)<\1>', r'\g<2>',
+                     re.IGNORECASE, 'UNTIL_FOUND'])
+
+    # optimize empty tags:
+    # <strong|emphasis|strikethrough|sup|sub|code}> </strong|emphasis|strikethrough|sup|sub|code>
+    # <emphasis> <strong> </strong> </emphasis>
+    # <strong> <emphasis> </emphasis> </strong>
+    # <strong|emphasis|strikethrough|sup|sub|code />
+    replaces.append([r'<(?:strong|emphasis|strikethrough|sup|sub|code)\s*/>', ' ', re.IGNORECASE])
+    # instead one very big expression we will repeat one the same until found :)
+    replaces.append([r'<(strong|emphasis|strikethrough|sup|sub|code)>(\s*(?:<br/>)?\s*)</\1>', r'\2',
+                     re.IGNORECASE, 'UNTIL_FOUND'])
+
+    # split multiple linebreaks into the single one
+    replaces.append([rf'(<br{ANYSP}*/>\s*)+', '<br/>', re.IGNORECASE])
+
+    # the collapse above rewrites every surviving linebreak to a literal
+    # '<br/>', so the remaining br rules can be gated on that substring
+    # and skipped outright on books without linebreaks
+
+    # clear alone linebreak in paragraph and transform it to empty
+    replaces.append([gated_replace('<br/>', re.compile(r'<p><br/></p>', re.IGNORECASE), '<empty-line/>')])
+
+    # clear start & finish linebreaks in paragraph
+    replaces.append([gated_replace('<br/>', re.compile(r'<br/></p>', re.IGNORECASE), '</p>')])
+    replaces.append([gated_replace('<br/>', re.compile(r'<p>\s*<br/>', re.IGNORECASE), '<p>')])
+
+    # transform linebrake (<br/>) into the single paragraph
+    replaces.append([gated_replace('<br/>', re.compile(r'<body.*?</body>', re.IGNORECASE | re.DOTALL),
+                                   extract_linebrakes_in_body)])
+
+    # place quotes inside tags
+    replaces.append([r'(["\'])(\s*)<(strong|emphasis|strikethrough|sup|sub|code)>(.*)</\3>([\s\.!\?,:]*)\1',
+                     r'\g<2><\g<3>>\g<1>\g<4>\g<1></\g<3>>\g<5>', re.IGNORECASE, 'UNTIL_FOUND'])
+    replaces.append([r'«(\s*)<(strong|emphasis|strikethrough|sup|sub|code)>(.*)</\2>([\s\.!\?,:]*)»',
+                     r'\g<1><\g<2>>«\g<3>»</\g<2>>\g<4>', re.IGNORECASE, 'UNTIL_FOUND'])
+
+    # convert multyspaces into the one
+    replaces.append([f'{ANYSP}{{2,}}', ' '])
+
+    # 2-5 dots into triple one (more dots may be placed with author's reason)
+    replaces.append([gated_replace('..', re.compile(r'(?<![\.\?\!])\.{2,5}(?!\.)'), '…')])
+
+    # При «встрече» многоточия с запятой последняя поглощается многоточием, которое указывает
+    # не только на пропуск слов, но и на пропуск знака препинания
+    replaces.append([gated_replace('…', re.compile(r'(?:,…|…,)'), '…')])
+    # the four run-collapsing rules are order-independent (verified by
+    # exhaustive comparison against the sequential passes), so one
+    # alternation scans the body once and dispatches on the matched group
+    replaces.append([SENTENCE_RUNS_PATTERN, lambda m: SENTENCE_RUNS_MAP[m.lastgroup]])
+    replaces.append([gated_replace('!?', re.compile(r'(?<![\?\!])\!\?(?![\?\!])'), '⁉')])
+    replaces.append([gated_replace('?!', re.compile(r'(?<![\?\!])\?\!(?![\?\!])'), '⁈')])
+
+    # После вопросительного/восклицательного знака ставятся не три точки (обычный вид многоточия),
+    # а две (третья точка стоит под одним из названных знаков)
+    replaces.append([PUNCTUATION_PATTERN, lambda m: PUNCTUATION_MAP[m.group()]])
+
+    # Если у вас вопросительно-восклицательное предложение, т. е. вы используете и вопросительный
+    # и восклицательный знак одновременно, то добавляется только одна точка.
+    replaces.append([gated_replace('…', re.compile(r'!\?…'), '!?.')])
+    replaces.append([gated_replace('…', re.compile(r'\?!…'), '?!.')])
+    replaces.append([gated_replace('…', re.compile(r'\?\?…'), '??.')])
+    replaces.append([gated_replace('…', re.compile(r'\!\!…'), '!!.')])
+
+    # strip paragraphs (clear first & last spaces)
+    replaces.append([r'<p>\s+', '<p>'])
+    replaces.append([rf'\s*</p>{ANYSP}*', '</p>'])
+
+    # optimize & transform empty paragraphs
+    # <p></p>, <p/>
+    replaces.append([r'(?:<p>\s*?</p>|<p */>)', '<empty-line/>'])
+
+    # split multiple empty paragraphs into the one
+    replaces.append([gated_replace('<empty-line', re.compile(r'(?:<empty-line/>\s*){2,}'), '<empty-line/>\n')])
+
+    # clear empty first & last paragraphs
+    # <title|section><empty-line/>
+    # <empty-line/></title|section>
+    replaces.append([gated_replace(
+        '<empty-line', re.compile(r'(?:(?:<empty-line/>\s*)?(</?(?:title|section)>)(?:\s*<empty-line/>)?)'),
+        r'\g<1>')])
+
+    # strip tags around images
+    replaces.append([r'<(strong|emphasis|strikethrough|sup|sub|code)>\s*(<image[^>]+>)\s*</\1>', r'\g<2>',
+                     re.IGNORECASE, 'UNTIL_FOUND'])
+    # extract images from paragraph
+    # <p><image id="..." l:href="#..." /></p>
+    # <p>text <image id="..." l:href="#..." /> text</p>
+    # <empty-line/><image id="..." l:href="#..." /><empty-line/>
+    replaces.append([r'(?:<empty-line/>\s*)?(<p>(?:^</p>)*?)?(<image[^>]+>)((?:^<p>)*?</p>)?(?:\s*<empty-line/>)?',
+                     r'\g<1></p>\g<2><p>\g<3>'])
+    # clean up tails from previous replace
+    replaces.append(
+        [
+            r'<p>(\s*)<((?:p|title|epigraph|annotation|section|subtitle|poem|cite|text-author)|(?:/section|/title|/epigraph))>',
+            r'\g<1><\g<2>>'])
+    replaces.append([
+        r'<((?:/p|/title|/epigraph|/annotation|/subtitle|/poem|/cite|/text-author)|(?:section|title|epigraph))>(\s*)</p>',
+        r'<\g<1>>\g<2>'])
+    replaces.append([strip_empty_p])
+
+    # very strange fact - single image in section broke the whole document
+    # let's add the empty line
+    replaces.append([r'(<section>\s*<image[^>]+?>)(\s*</section>)', r'\g<1>\n<empty-line/>\g<2>'])
+
+    # optimize & transform subtitle
+    # <empty-line/><p|subtitle>***</p|subtitle><empty-line/>
+    # <empty-line/><p|subtitle><strong|emphasis|strikethrough|sup|sub|code>* * * *</strong|emphasis|strikethrough|sup|sub|code></p|subtitle><empty-line/>
+    # <empty-line/><p|subtitle><strong><emphasis>* *</emphasis></strong></p|subtitle><empty-line/>
+    # <empty-line/><p|subtitle><emphasis><strong>******</strong></emphasis></p|subtitle><empty-line/>
+    # possessive repeats: divider runs can't backtrack, so mixed-content
+    # paragraphs fail fast instead of exploding combinatorially
+    replaces.append([
+        rf'(?:(?:<empty-line */>)\s*)*<(p|subtitle)> ?(?:(?:<(strong|emphasis|strikethrough|sup|sub|code)> ?{ANYSUB}' +
+        rf'++ ?</\2>)|(?:<strong> ?<emphasis> ?{ANYSUB}' +
+        rf'++ ?</emphasis> ?</strong>)|(?: ?<emphasis> ?<strong> ?{ANYSUB}' +
+        rf'++ ?</strong> ?</emphasis>)|{ANYSUB}' +
+        r'++) ?</\1>(?:\s*(?:<empty-line */>))*',
+        '<subtitle>* * *</subtitle>'])
+
+    # replacing the apostrophe
+    replaces.append([r'(?<=\w)[`\'](?=\w)', '’'])
+
+    return replaces
+
+
+# the global replace table is static; compile every pattern once at import
+# (process_replaces passes pre-compiled entries straight to pattern.sub)
+GLOBAL_REPLACES = tuple(
+    [re.compile(f'{r[0]}', r[2] if len(r) > 2 else re.NOFLAG) if isinstance(r[0], str) else r[0]] + r[1:]
+    for r in global_replaces()
+)
+
+
 class PureFb2:
     __source: bytes | str
     __destination: str
@@ -318,6 +626,10 @@ class PureFb2:
         self.__destination = destination
         self.__finished = None
         self.__soup = None
+        # memoized getter results, dropped via __touch on every tree mutation
+        self.__cache: dict = {}
+        # per-thread scratch buffers for the image re-encode loop
+        self.__streams = threading.local()
 
     @property
     def out_format(self) -> list:
@@ -372,7 +684,8 @@ class PureFb2:
     @title.setter
     def title(self, title: str) -> None:
         if self.is_opened():
-            self.__soup.select_one('book-title').string.replace_with(title)
+            self.__soup.find('book-title').string.replace_with(title)
+            self.__touch()
 
     @property
     def last_chapter_title(self) -> str:
@@ -396,9 +709,10 @@ class PureFb2:
 
     @sequence.setter
     def sequence(self, sequence: dict) -> None:
-        if self.is_opened() and self.__soup.select_one('sequence'):
+        if self.is_opened() and self.__soup.find('sequence'):
             self.__soup.sequence['name'] = sequence['name']
             self.__soup.sequence['number'] = sequence['number']
+            self.__touch()
 
     @property
     def chapters(self) -> list:
@@ -434,15 +748,13 @@ class PureFb2:
         return self
 
     def has_author(self, name: str) -> bool:
-        result: bool = False
-        name = re.sub(r'\s+', ' ', name.strip())
-        authors: list = self.authors
-        for first_name, middle_name, last_name, home_page in authors:
-            author_name = f'{first_name} {middle_name} {last_name}'.replace('  ', ' ').strip()
-            if name.lower() == author_name.lower():
-                result = True
-                break
-        return result
+        # the normalized-name set is built once per tree state; __process_body
+        # probes it for every author-replace entry
+        if (names := self.__cache.get('author-names')) is None:
+            names = {f'{first_name} {middle_name} {last_name}'.replace('  ', ' ').strip().lower()
+                     for first_name, middle_name, last_name, home_page in self.authors}
+            self.__cache['author-names'] = names
+        return ' '.join(name.split()).lower() in names
 
     def get_file_name(self) -> str:
 
@@ -457,23 +769,26 @@ class PureFb2:
             book_time=self._time_modified
         ))
 
-        if len(file_name.encode("utf-8")) > (max_filename_length(file_name) - 8):  # 8 = '.fb2.zip'
-            file_name = file_name.encode("utf-8")[0:(max_filename_length(file_name) - 8)].decode('utf-8')
+        encoded = file_name.encode("utf-8")
+        limit = max_filename_length(file_name) - 8  # 8 = '.fb2.zip'
+        if len(encoded) > limit:
+            file_name = encoded[:limit].decode('utf-8')
 
         return file_name
 
     def open_zip(self, source: str | bytes) -> Self:
-        source = Zipper(io.BytesIO(source) if isinstance(source, bytes) else source).open().encode('utf-8')
+        source = Zipper(io.BytesIO(source) if isinstance(source, bytes) else source).open_bytes()
         return self.open(source)
 
     def open(self, source: str | bytes | bytearray) -> Self:
         self._open_time = datetime.now()
+        self.__touch()
         if isinstance(source, bytearray):
             source = bytes(source)
         if isinstance(source, str) and source.endswith('.zip'):
-            source = Zipper(source).open().encode('utf-8')
+            source = Zipper(source).open_bytes()
         if isinstance(source, bytes) and "<?xml" not in str(source[:10]):
-            source = Zipper(io.BytesIO(source)).open().encode('utf-8')
+            source = Zipper(io.BytesIO(source)).open_bytes()
 
         if source:
             self.__source = source
@@ -483,13 +798,15 @@ class PureFb2:
                 if isinstance(source, bytes) and '' != (file := source.decode('utf-8')):
                     if self._debug:
                         print('Got from bytes')
-                    self.__soup = BeautifulSoup(file, "xml")
+                    self.__soup = BeautifulSoup(file, "lxml-xml")
                     self.atinfo = self.url
                 else:
                     if self._debug:
                         print('Got from file')
-                    with open(self.__source, 'r+', encoding='utf-8') as file:
-                        self.__soup = BeautifulSoup(file, "xml")
+                    # binary mode: lxml reads the encoding from the XML
+                    # declaration, no Python-level decode (or writability) needed
+                    with open(self.__source, 'rb') as file:
+                        self.__soup = BeautifulSoup(file, "lxml-xml")
                         self.atinfo = self.url
             except EnvironmentError as err:
                 print(f'Book opening Error: {err}')
@@ -522,10 +839,15 @@ class PureFb2:
                 # full_name = os.path.basename(self.__destination)
 
                 if args.get('prettify', True):
-                    xml = prettify_fb2(str(self.__soup.prettify()))
+                    # prettify_fb2 re-indents from scratch, so the Python-level
+                    # soup.prettify() walk would be pure wasted work here
+                    xml = prettify_fb2(str(self.__soup))
                 else:
                     xml = str(self.__soup)
 
+                # encode once; every output branch below consumes the same bytes
+                xml = xml.encode('utf-8')
+
                 if self.__destination is None:
                     if 'zip' in self.out_format:
                         if self._debug:
@@ -534,14 +856,17 @@ class PureFb2:
                             imz.append(to_latin(file_name, 'lower', True) + '.fb2', xml)
                         self.__source = imz.data
                     else:
-                        self.__source = bytes(xml, 'utf-8')
+                        self.__source = xml
                 else:
                     try:
                         if 'zip' in self.out_format:
                             if self._debug:
                                 print(os.path.join(self.__destination, file_name + '.fb2.zip'))
-                            with InMemoryZipper(os.path.join(self.__destination, file_name + '.fb2.zip')) as imz:
-                                imz.append(to_latin(file_name, 'lower', True) + '.fb2', xml)
+                            # write straight to the destination file: no reason to
+                            # hold a second copy of the archive in memory first
+                            with ZipFile(os.path.join(self.__destination, file_name + '.fb2.zip'), 'w',
+                                         compression=ZIP_DEFLATED, compresslevel=6) as zf:
+                                zf.writestr(to_latin(file_name, 'lower', True) + '.fb2', xml)
                     except EnvironmentError as err:
                         print(f'Saving book to ZIP Error: {err}')
                         pass
@@ -550,8 +875,7 @@ class PureFb2:
                         if 'fb2' in self.out_format:
                             if self._debug:
                                 print(os.path.join(self.__destination, file_name + '.fb2'))
-                            with open(os.path.join(self.__destination, file_name + '.fb2'), 'w+',
-                                      encoding='utf-8') as file:
+                            with open(os.path.join(self.__destination, file_name + '.fb2'), 'wb') as file:
                                 file.write(xml)
                     except EnvironmentError as err:
                         print(f'Saving book to FB2 Error: {err}')
@@ -567,8 +891,9 @@ class PureFb2:
         # it was the BAD idea to process each paragraph separately
         # VERY, VERY SLOW! :(
         # Let's proceed whole body!
+        namespaces = self.__get_namespaces(True)
         for body in self.__soup.find_all('body'):
-            new_body = str(body)
+            old_body = new_body = str(body)
 
             replaces = []
 
@@ -581,19 +906,22 @@ class PureFb2:
                         for arp in ar.get('patterns'):
                             replaces.append(arp)
 
-            replaces = self.__optimize_global(replaces)
+            replaces.extend(GLOBAL_REPLACES)
 
             new_body = process_replaces(new_body, replaces)
 
             if typography:
-                new_body = re.sub(r'<p>([\s\S]+?)</p>', lambda x: ru_typus(x.group()), new_body)
+                new_body = PARAGRAPH_PATTERN.sub(typus_paragraph, new_body)
                 # Special case with leading punctuation
                 # см. http://old-rozental.ru/punctuatio.php?sid=176
                 # new_body = re.sub(r'([,\.!\?;]) — ', r'\g<1> — ', new_body)
-            soup = BeautifulSoup(f'<xml {get_namespaces(self.__soup, True)}>{new_body}</xml>', 'xml')
-            new_body = soup.select_one('xml')
-            body.replace_with(new_body)
-            new_body.unwrap()
+            # re-parse and swap the body only if some replace actually fired
+            if new_body != old_body:
+                soup = BeautifulSoup(f'<xml {namespaces}>{new_body}</xml>', 'lxml-xml')
+                new_body = soup.find('xml')
+                body.replace_with(new_body)
+                new_body.unwrap()
+                self.__touch()
 
     def set_authors_dict(self, authors_dict: dict) -> Self:
         self.authors_dict = authors_dict
@@ -627,7 +955,16 @@ class PureFb2:
         return self
 
     def set_author_replaces(self, author_replaces: list) -> Self:
-        self._author_replaces = author_replaces
+        # compile pattern strings up front so every matched author costs
+        # pattern.sub only, mirroring GLOBAL_REPLACES
+        self._author_replaces = [
+            {**ar, 'patterns': [
+                [re.compile(f'{r[0]}', r[2] if len(r) > 2 else re.NOFLAG) if isinstance(r[0], str) else r[0]]
+                + list(r[1:])
+                for r in ar.get('patterns', [])
+            ]}
+            for ar in author_replaces
+        ]
         return self if self.is_opened else False
 
     def set_debug(self, debug: bool = False) -> Self:
@@ -636,9 +973,10 @@ class PureFb2:
 
     def __process_title_info(self) -> None:
         if self.__soup is not None:
-            if (parent := self.__soup.find('title-info')) is None:
+            if (parent := self.__get_title_info()) is None:
                 parent = self.__soup.new_tag('title-info')
-                self.__soup.find('description').insert(1, parent)
+                self.__get_description().insert(1, parent)
+                self.__touch()
             self.__process_title()
             self.__process_sequence()
             self.__process_genres()
@@ -655,22 +993,22 @@ class PureFb2:
         genres: list = self.genres if not (
                 self.atinfo.is_valid() and (at_genres := self.atinfo.genres_en)) else at_genres
         if len(genres):
-            parent = self.__soup.find('title-info')
-            clear_tags(parent, 'genre')
+            parent = self.__get_title_info()
+            clear_tags(parent, 'genre', False)
             append_tags(self.__soup, parent, 'genre', genres)
 
     def __get_genres(self) -> list:
         genres: list = []
         if self.__soup is not None:
-            for genre in self.__soup.find('title-info').find_all('genre'):
+            for genre in self.__get_title_info().find_all('genre'):
                 genres.append(genre.text)
         return genres
 
     def __process_authors(self) -> None:
         authors: list = self.authors if not (self.atinfo.is_valid() and (at_atrs := self.atinfo.authors)) else at_atrs
         if len(authors):
-            clear_tags(self.__soup.find('title-info'), 'author')
-            root = self.__soup.find('title-info').find('book-title')
+            clear_tags(self.__get_title_info(), 'author', False)
+            root = self.__get_title_info().find('book-title')
             # we will add each author at the top of position so let's reverce the list first
             authors.reverse()
             for first_name, middle_name, last_name, home_page in authors:
@@ -689,6 +1027,7 @@ class PureFb2:
                     append_tag(self.__soup, tag, 'last-name', last_name)
                 if home_page != '':
                     append_tag(self.__soup, tag, 'home-page', home_page)
+            self.__touch()
         return
 
     def __get_author(self, last_first: bool = False, safe: bool = True) -> str:
@@ -701,21 +1040,25 @@ class PureFb2:
         return author
 
     def __get_authors(self, only_one: bool = False, safe: bool = True) -> list:
+        if (authors := self.__cache.get(('authors', only_one, safe))) is not None:
+            return authors
         authors: list = []
         if self.__soup is not None:
-            for author in self.__soup.find('title-info').find_all('author'):
-                first_name = author.select_one('first-name')
-                middle_name = author.select_one('middle-name')
-                last_name = author.select_one('last-name')
-                home_page = author.select_one('home-page')
+            for author in self.__get_title_info().find_all('author'):
+                # one pass over the children instead of a select_one walk per field
+                fields = {'first-name': None, 'middle-name': None, 'last-name': None, 'home-page': None}
+                for child in author.find_all(recursive=False):
+                    if fields.get(child.name) is None:
+                        fields[child.name] = child.text
                 authors.append([
-                    normalize_text(first_name.text, safe, True) if first_name is not None else '',
-                    normalize_text(middle_name.text, safe, True) if middle_name is not None else '',
-                    normalize_text(last_name.text, safe, True) if last_name is not None else '',
-                    home_page.text if home_page is not None else ''
+                    normalize_text(fields['first-name'], safe, True) if fields['first-name'] is not None else '',
+                    normalize_text(fields['middle-name'], safe, True) if fields['middle-name'] is not None else '',
+                    normalize_text(fields['last-name'], safe, True) if fields['last-name'] is not None else '',
+                    fields['home-page'] or ''
                 ])
                 if only_one:
                     break
+        self.__cache[('authors', only_one, safe)] = authors
         return authors
 
     def __get_authors_plain(self, author: str = '{first_name} {last_name}') -> list:
@@ -741,25 +1084,20 @@ class PureFb2:
         if name is not None:
             # name = name.replace('Ё', 'Е').replace('ё', 'е').strip().removesuffix('.')
             # name = re.sub(r'\s+', ' ', name)
-            name = re.sub(r'\s+', ' ', name).strip()
+            name = ' '.join(name.split())
             if name != '':
                 name = name.split(' ')
-                match namelen := len(name):
-                    # case 3:
-                    #    author = [name[0], name[1], name[2]]
-                    case 2:
-                        author = [name[0], '', name[1]]
-                    case 1:
-                        author = [name[0], '', '']
-                    case _:
-                        # author = [name[0], ' '.join(name[1:namelen - 1]), name[-1]]
-                        author = [' '.join(name[0:namelen - 1]), '', name[-1]]
+                if len(name) == 1:
+                    author = [name[0], '', '']
+                else:
+                    # author = [name[0], ' '.join(name[1:-1]), name[-1]]
+                    author = [' '.join(name[:-1]), '', name[-1]]
             author.append(homepage)
         return author
 
     def __process_date(self, parent: Tag) -> None:
         if self.atinfo.is_valid():
-            clear_tags(parent, 'date')
+            clear_tags(parent, 'date', False)
             date_tag = self.__soup.new_tag('date')
             # date_value = self.atinfo.time_modified if self.atinfo.is_valid() else datetime.now().strftime('%Y-%m-%d %H:%M')
             # self._time_modified = self.atinfo.time_updated
@@ -770,11 +1108,12 @@ class PureFb2:
 
     def __process_document_info(self) -> None:
         if self.__soup is not None:
-            if (parent := self.__soup.find('document-info')) is None:
+            if (parent := self.__get_document_info()) is None:
                 parent = self.__soup.new_tag('document-info')
-                self.__soup.find('description').insert(2, parent)
+                self.__get_description().insert(2, parent)
+                self.__touch()
             else:
-                clear_tags(parent, 'author')
+                clear_tags(parent, 'author', False)
                 author_tag = self.__soup.new_tag('author')
                 parent.insert(1, author_tag)
                 append_tag(self.__soup, author_tag, 'first-name',
@@ -784,7 +1123,7 @@ class PureFb2:
                 if 'author_home' in self._document_info and self._document_info['author_home'] != '':
                     append_tag(self.__soup, author_tag, 'home-page', self._document_info['author_home'])
 
-                clear_tags(parent, 'date')
+                clear_tags(parent, 'date', False)
                 date_tag = self.__soup.new_tag('date')
                 date_value = datetime.now().strftime('%Y-%m-%d %H:%M')
                 date_tag['value'] = date_value
@@ -792,13 +1131,13 @@ class PureFb2:
                 parent.insert(2, date_tag)
 
                 programs = []
-                if (programs_used := parent.select_one('program-used')) is not None and programs_used.string:
+                if (programs_used := parent.find('program-used')) is not None and programs_used.string:
                     # re.split('\s*,\s*', programs_used.string)
                     for program_used in programs_used.string.split(','):
                         if '' != (program_used := program_used.strip()) and program_used != 'PureFB2':
                             programs.append(program_used)
                 programs.append('PureFB2')
-                clear_tags(parent, 'program-used')
+                clear_tags(parent, 'program-used', False)
                 append_tag(self.__soup, parent, 'program-used', ', '.join(programs))
 
     def __process_promo(self, add_custom_promo: bool = False) -> None:
@@ -808,216 +1147,62 @@ class PureFb2:
                     and promo.find_parent().name == 'title' \
                     and promo.find_parent().find_parent().name == 'section':
                 promo.find_parent().find_parent().decompose()
+                self.__touch()
             if add_custom_promo and 'promo_section' in self._document_info:
                 # promo = eval(f"f'{self._document_info['promo_section']}'")
-                url_xmlns = f'{get_namespaces(self.__soup)["http://www.w3.org/1999/xlink"]}:' \
-                    if 'http://www.w3.org/1999/xlink' in get_namespaces(self.__soup) else ''
-                promo = self._document_info['promo_section'].format(
-                    author_name=self._document_info['author_name'] if 'author_name' in self._document_info and
-                                                                      self._document_info['author_name'].strip() != ''
-                    else 'PureFb2',
-                    author_home=self._document_info['author_home'] if 'author_home' in self._document_info and
-                                                                      self._document_info['author_home'].strip() != ''
-                    else '#',
+                namespaces = self.__get_namespaces()
+                url_xmlns = f'{namespaces["http://www.w3.org/1999/xlink"]}:' \
+                    if 'http://www.w3.org/1999/xlink' in namespaces else ''
+                info = self._document_info
+                promo = info['promo_section'].format_map(PromoArgs(
+                    author_name=info['author_name'] if info.get('author_name', '').strip() != '' else 'PureFb2',
+                    author_home=info['author_home'] if info.get('author_home', '').strip() != '' else '#',
                     src_url=self.url,
                     url_xmlns=url_xmlns,
                     book_title=self.title
-                )
-                soup = BeautifulSoup(f'<promo {get_namespaces(self.__soup, True)}><section>{promo}</section></promo>',
-                                     'xml')
-                promo = soup.select_one('promo')
-                self.__soup.select_one('body').append(promo)
+                ))
+                soup = BeautifulSoup(f'<promo {self.__get_namespaces(True)}><section>{promo}</section></promo>',
+                                     'lxml-xml')
+                promo = soup.find('promo')
+                self.__get_body().append(promo)
                 promo.unwrap()
+                self.__touch()
 
     def __prepare_custom(self) -> None:
         if self.finished:
             self.add_custom_tag('status', ('fulltext' if self.atinfo.is_valid() else '3'))
-        for info in self.__soup.find('description').find_all('custom-info'):
-            attrs = dict({atr[0]: atr[1] for atr in info.attrs.items()})
-            if 'info-type' in attrs:
-                if attrs['info-type'] == 'donated' and info.text.lower() in ('true', '1', 'false', '0'):
-                    self.add_custom_tag('donated', info.text, True)
-                elif attrs['info-type'] == 'convert-images' and info.text.lower() in ('true', '1', 'false', '0'):
-                    self.add_custom_tag('convert-images', info.text, True)
-                    self._convert_images = True if info.text.lower() in ('true', '1') else False
+        for info in self.__get_description().find_all('custom-info'):
+            # attrs is already a dict; no need to copy it just to probe one key
+            info_type = info.get('info-type')
+            if info_type == 'donated' and info.text.lower() in ('true', '1', 'false', '0'):
+                self.add_custom_tag('donated', info.text, True)
+            elif info_type == 'convert-images' and info.text.lower() in ('true', '1', 'false', '0'):
+                self.add_custom_tag('convert-images', info.text, True)
+                self._convert_images = True if info.text.lower() in ('true', '1') else False
 
     def __process_custom(self) -> None:
-        parent = self.__soup.find('description')
-        clear_tags(parent, 'custom-info')
+        parent = self.__get_description()
+        clear_tags(parent, 'custom-info', False)
         custom: list = self._custom_tags
-        clear_tags(parent, 'custom-info')
         if len(custom):
             append_tags(self.__soup, parent, 'custom-info', custom)
 
-    def __optimize_global(self, replaces: list = []) -> list:
-        """
-        (r'<title>\s*\n*<p>(.*)</p>\s*\n*</title>\n*<p>\s*(\1|(<strong>\1</strong>))\s*</p>',
-            r'<title>\n<p>\1</p>\n</title>'),
-        (r'<p>(<\w+>)*\s*\*\s*\*\s*\*s*(</\w+>)*</p>', '<subtitle>* * *</subtitle>'),
-        (r'\n+', '\n'),
-        (r'\.(?=</p>\s*\n*</title>)', ''),
-        """
-        # starts_at = content.find('<body')
-        # ends_at = content.rfind('</body>') + len('</body>')
-        # header = content[:starts_at]
-        # footer = content[ends_at:]
-        # we will replace occurrences in body section only
-        # content = content[starts_at:ends_at]
-
-        # !!! EXPERIMENTAL !!!
-        # remove some ugly cases after title like:
-        # <title>
-        # <p>Глава 1.1</p>
-        # </title>
-        # <p>Часть 1.</p>
-        # <p>Глава 1.1</p>
-        # replaces.append(
-        #    [r'(?<!<title>)\s+<p>\s*(?:часть|глава|том|книга|раздел|арка)\s*(?:\d+\.?)+\s*</p>(?!(?:\s+</title>))',
-        #     '', re.IGNORECASE])
-
-        # TWO ANY STANDALONE DASH to EM DASH
-        replaces.append([f'(?<!{ANYDASH}){ANYDASH}{{2}}(?!{ANYDASH})', MDASH])
-
-        # add space after any dashes at dialogue & convert it into the md dash
-        replaces.append([f'{ANYSP}{ANYDASH}{ANYSP}', MDASH_PAIR])
-        replaces.append([rf'<(\w+?)>{ANYDASH}{ANYSP}', rf'<\1>{MDASH}{NBSP}'])
-        replaces.append([rf'>{ANYDASH}([<A-ZА-ЯҐІЇЄ\.,\'«"])', rf'>{MDASH}{NBSP}\g<1>'])
-        replaces.append([rf'({ANYSP}{ANYDASH}[<A-ZА-ЯҐІЇЄ\.,\'«"])', rf'{MDASH}{NBSP}\g<1>'])
-
-        # clean up bold, italic, underline, strike HTML tags
-        replaces.append([r'<([b|i|u|s])>([\s\S]*?)</\1>', r'\g<2>', re.IGNORECASE])
-        replaces.append([r'<([b|i|u|s])\s*/>', '', re.IGNORECASE])
-
-        # split two consecutive tags into the single one
-        replaces.append([r'</(strong|emphasis|strikethrough|sup|sub|code)>(\s*)<\1>', r'\g<2>',
-                         re.IGNORECASE, 'UNTIL_FOUND'])
-
-        # optimize empty tags:
-        # <strong|emphasis|strikethrough|sup|sub|code}> </strong|emphasis|strikethrough|sup|sub|code>
-        # <emphasis> <strong> </strong> </emphasis>
-        # <strong> <emphasis> </emphasis> </strong>
-        # <strong|emphasis|strikethrough|sup|sub|code />
-        replaces.append([r'<(?:strong|emphasis|strikethrough|sup|sub|code)\s*/>', ' ', re.IGNORECASE])
-        # instead one very big expression we will repeat one the same until found :)
-        replaces.append([r'<(strong|emphasis|strikethrough|sup|sub|code)>(\s*(?:<br/>)?\s*)</\1>', r'\2',
-                         re.IGNORECASE, 'UNTIL_FOUND'])
-
-        # split multiple linebreaks into the single one
-        replaces.append([rf'(<br{ANYSP}*/>\s*)+', '<br/>', re.IGNORECASE])
-
-        # clear alone linebreak in paragraph and transform it to empty
-        replaces.append([r'<p><br/></p>', '<empty-line/>', re.IGNORECASE])
-
-        # clear start & finish linebreaks in paragraph
-        replaces.append([r'<br/></p>', '</p>', re.IGNORECASE])
-        replaces.append([r'<p>\s*<br/>', '<p>', re.IGNORECASE])
-
-        # transform linebrake (<br/>) into the single paragraph
-        replaces.append([r'<body.*?</body>', 'extract_linebrakes_in_body', re.IGNORECASE | re.DOTALL, 'EXECUTIVE'])
-
-        # place quotes inside tags
-        replaces.append([r'(["\'])(\s*)<(strong|emphasis|strikethrough|sup|sub|code)>(.*)</\3>([\s\.!\?,:]*)\1',
-                         r'\g<2><\g<3>>\g<1>\g<4>\g<1></\g<3>>\g<5>', re.IGNORECASE, 'UNTIL_FOUND'])
-        replaces.append([r'«(\s*)<(strong|emphasis|strikethrough|sup|sub|code)>(.*)</\2>([\s\.!\?,:]*)»',
-                         r'\g<1><\g<2>>«\g<3>»</\g<2>>\g<4>', re.IGNORECASE, 'UNTIL_FOUND'])
-
-        # convert multyspaces into the one
-        replaces.append([f'{ANYSP}{{2, }}', ' '])
-
-        # 2-5 dots into triple one (more dots may be placed with author's reason)
-        replaces.append([r'(?<![\.\?\!])\.{2,5}(?!\.)', '…'])
-
-        # При «встрече» многоточия с запятой последняя поглощается многоточием, которое указывает
-        # не только на пропуск слов, но и на пропуск знака препинания
-        replaces.append([r'(?:,…|…,)', '…'])
-        replaces.append([r'(?<!\?)\?{3,5}(?!\?)', '???'])
-        replaces.append([r'(?<!\?)\?\?(?!\?)', '⁇'])
-        replaces.append([r'(?<!\!)\!{3,5}(?!\!)', '!!!'])
-        replaces.append([r'(?<!\!)!!(?<!\!)', '‼'])
-        replaces.append([r'(?<![\?\!])\!\?(?![\?\!])', '⁉'])
-        replaces.append([r'(?<![\?\!])\?\!(?![\?\!])', '⁈'])
-
-        # После вопросительного/восклицательного знака ставятся не три точки (обычный вид многоточия),
-        # а две (третья точка стоит под одним из названных знаков)
-        replaces.append([r'\?…', '?..'])
-        replaces.append([r'!…', '!..'])
-
-        # Если у вас вопросительно-восклицательное предложение, т. е. вы используете и вопросительный
-        # и восклицательный знак одновременно, то добавляется только одна точка.
-        replaces.append([r'!\?…', '!?.'])
-        replaces.append([r'\?!…', '?!.'])
-        replaces.append([r'\?\?…', '??.'])
-        replaces.append([r'\!\!…', '!!.'])
-        replaces.append([r'⁈!', '?!!'])
-        replaces.append([r'⁉\?', '!??'])
-
-        # strip paragraphs (clear first & last spaces)
-        replaces.append([r'<p>\s+', '<p>'])
-        replaces.append([rf'\s*</p>{ANYSP}*', '</p>'])
-
-        # optimize & transform empty paragraphs
-        # <p></p>, <p/>
-        replaces.append([r'(?:<p>\s*?</p>|<p */>)', '<empty-line/>'])
-
-        # split multiple empty paragraphs into the one
-        replaces.append([r'(?:<empty-line/>\s*){2,}', '<empty-line/>\n'])
-
-        # clear empty first & last paragraphs
-        # <title|section><empty-line/>
-        # <empty-line/></title|section>
-        replaces.append([r'(?:(?:<empty-line/>\s*)?(</?(?:title|section)>)(?:\s*<empty-line/>)?)', r'\g<1>'])
-
-        # strip tags around images
-        replaces.append([r'<(strong|emphasis|strikethrough|sup|sub|code)>\s*(<image[^>]+>)\s*</\1>', r'\g<2>',
-                         re.IGNORECASE, 'UNTIL_FOUND'])
-        # extract images from paragraph
-        # <p><image id="..." l:href="#..." /></p>
-        # <p>text <image id="..." l:href="#..." /> text</p>
-        # <empty-line/><image id="..." l:href="#..." /><empty-line/>
-        replaces.append([r'(?:<empty-line/>\s*)?(<p>(?:^</p>)*?)?(<image[^>]+>)((?:^<p>)*?</p>)?(?:\s*<empty-line/>)?',
-                         r'\g<1></p>\g<2><p>\g<3>'])
-        # clean up tails from previous replace
-        replaces.append(
-            [
-                r'<p>(\s*)<((?:p|title|epigraph|annotation|section|subtitle|poem|cite|text-author)|(?:/section|/title|/epigraph))>',
-                r'\g<1><\g<2>>'])
-        replaces.append([
-            r'<((?:/p|/title|/epigraph|/annotation|/subtitle|/poem|/cite|/text-author)|(?:section|title|epigraph))>(\s*)</p>',
-            r'<\g<1>>\g<2>'])
-        replaces.append([r'<p>(\s*)</p>', r'\g<1>'])
-
-        # very strange fact - single image in section broke the whole document
-        # let's add the empty line
-        replaces.append([r'(<section>\s*<image[^>]+?>)(\s*</section>)', r'\g<1>\n<empty-line/>\g<2>'])
-
-        # optimize & transform subtitle
-        # <empty-line/><p|subtitle>***</p|subtitle><empty-line/>
-        # <empty-line/><p|subtitle><strong|emphasis|strikethrough|sup|sub|code>* * * *</strong|emphasis|strikethrough|sup|sub|code></p|subtitle><empty-line/>
-        # <empty-line/><p|subtitle><strong><emphasis>* *</emphasis></strong></p|subtitle><empty-line/>
-        # <empty-line/><p|subtitle><emphasis><strong>******</strong></emphasis></p|subtitle><empty-line/>
-        replaces.append([
-            rf'(?:(?:<empty-line */>)\s*)*<(p|subtitle)> ?(?:(?:<(strong|emphasis|strikethrough|sup|sub|code)> ?{ANYSUB}' +
-            rf'+? ?</\2>)|(?:<strong> ?<emphasis> ?{ANYSUB}' +
-            rf'+? ?</emphasis> ?</strong>)|(?: ?<emphasis> ?<strong> ?{ANYSUB}' +
-            rf'+? ?</strong> ?</emphasis>)|{ANYSUB}' +
-            r'+?) ?</\1>(?:\s*(?:<empty-line */>))*',
-            '<subtitle>* * *</subtitle>'])
-
-        # replacing the apostrophe
-        replaces.append([r'(?<=\w)[`\'](?=\w)', '’'])
-
-        return replaces
-
     def chapter_exists(self, title: str) -> bool:
+        # like the author-name set: one walk per tree state, O(1) probes after
         if self.__soup is not None:
-            for section in self.__soup.find('body').findChildren('section'):
-                if section.findChild('title').find('p', string=f"{title}") is not None:
-                    return True
+            if (titles := self.__cache.get('chapter-titles')) is None:
+                titles = set()
+                for section in self.__get_sections():
+                    for paragraph in section.findChild('title').find_all('p'):
+                        if paragraph.string is not None:
+                            titles.add(paragraph.string)
+                self.__cache['chapter-titles'] = titles
+            return title in titles
         return False
 
     def chapter_exists_alt(self, title: str) -> bool:
         if self.__soup is not None:
-            title = self.__soup.find('p', string=f"{title}")
+            title = self.__soup.find('p', string=title)
         return title is not None \
             and title.find_parent().name == 'title' \
             and title.find_parent().find_parent().name == 'section' \
@@ -1025,60 +1210,101 @@ class PureFb2:
 
     # private methods
 
+    def __touch(self) -> None:
+        """Drop memoized getter results after a tree mutation."""
+        self.__cache.clear()
+
+    def __get_description(self) -> Optional[Tag]:
+        if (description := self.__cache.get('description')) is None:
+            self.__cache['description'] = description = self.__soup.find('description')
+        return description
+
+    def __get_namespaces(self, as_string: bool = False) -> dict | str:
+        key = 'namespaces-str' if as_string else 'namespaces'
+        if (namespaces := self.__cache.get(key)) is None:
+            self.__cache[key] = namespaces = get_namespaces(self.__soup, as_string)
+        return namespaces
+
+    def __get_body(self) -> Optional[Tag]:
+        if (body := self.__cache.get('body')) is None:
+            self.__cache['body'] = body = self.__soup.find('body')
+        return body
+
+    def __get_sections(self) -> list:
+        if (sections := self.__cache.get('sections')) is None:
+            self.__cache['sections'] = sections = self.__get_body().findChildren('section')
+        return sections
+
+    def __get_title_info(self) -> Optional[Tag]:
+        # cached handle; callers creating the tag must invalidate via __touch
+        if (title_info := self.__cache.get('title-info')) is None:
+            self.__cache['title-info'] = title_info = self.__soup.find('title-info')
+        return title_info
+
+    def __get_document_info(self) -> Optional[Tag]:
+        if (document_info := self.__cache.get('document-info')) is None:
+            self.__cache['document-info'] = document_info = self.__soup.find('document-info')
+        return document_info
+
     def __get_title(self, safe: bool = True) -> str:
+        if (title := self.__cache.get(('title', safe))) is not None:
+            return title
         title = ''
         if self.__soup is not None:
-            if (title := self.__soup.find('title-info').findChild('book-title')) is not None:
+            if (title := self.__get_title_info().findChild('book-title')) is not None:
                 title = title.text
             else:
                 title = ''
-        return title if title == '' or safe is False else normalize_text(str(title), True)
+        title = title if title == '' or safe is False else normalize_text(str(title), True)
+        self.__cache[('title', safe)] = title
+        return title
 
     def __get_url(self) -> str:
+        if (url := self.__cache.get('url')) is not None:
+            return url
         url = ''
         if self.__soup is not None:
-            if self.__soup.find('document-info') is not None and \
-                    (url := self.__soup.find('document-info').findChild('src-url')) is not None:
+            if (document_info := self.__get_document_info()) is not None and \
+                    (url := document_info.findChild('src-url')) is not None:
                 url = url.text
             else:
                 url = ''
+        self.__cache['url'] = url
         return url
 
     def __get_sequence(self, safe: bool = True) -> dict:
+        if (sequence := self.__cache.get(('sequence', safe))) is not None:
+            return sequence
         sequence = {'name': '', 'number': ''}
         if self.__soup is not None:
-            if seq := self.__soup.select_one('sequence'):
+            if seq := self.__soup.find('sequence'):
                 sequence = {'name': str(seq.get('name')), 'number': int(seq.get('number', '0'))}
                 if safe:
                     sequence['name'] = normalize_text(sequence['name'], True)
-                    sequence['number'] = '{:0>2}'.format(sequence['number'])
+                    sequence['number'] = f"{sequence['number']:02d}"
+        self.__cache[('sequence', safe)] = sequence
         return sequence
 
     def __check_finished_state(self) -> bool:
         if self.__finished is None:
-            for info in self.__soup.find('description').find_all('custom-info'):
-                attrs = dict({atr[0]: atr[1] for atr in info.attrs.items()})
-                if 'info-type' in attrs and attrs['info-type'] == 'status' and info.text.lower() in \
+            for info in self.__get_description().find_all('custom-info'):
+                if info.get('info-type') == 'status' and info.text.lower() in \
                         ('fulltext', 'full', 'finished', '3'):
                     self.__finished = True
             if not self.__finished:
                 if 'author.today' in self.url:
                     self.__finished = self.atinfo.finished
                 else:
-                    epilogues = ['Эпилог', 'ЭПИЛОГ', 'эпилог', 'Послесловие', 'Примечания', 'ПРИМЕЧАНИЯ']
-                    self.__finished = True if any(
-                        epilogue in self.last_chapter_title for epilogue in epilogues) else False
+                    self.__finished = EPILOGUE_PATTERN.search(self.last_chapter_title) is not None
         return self.__finished
 
     def __check_donated_state(self) -> bool:
-        for info in self.__soup.find('description').find_all('custom-info'):
-            attrs = dict({atr[0]: atr[1] for atr in info.attrs.items()})
-            if 'info-type' in attrs and attrs['info-type'] == 'donated' and info.text.lower() in ('true', '1'):
+        for info in self.__get_description().find_all('custom-info'):
+            if info.get('info-type') == 'donated' and info.text.lower() in ('true', '1'):
                 return True
         return False
 
     def __process_section_titles(self) -> None:
-        TITLE_SEPARATOR = r'[\.:,\{}\{}\{}\{}\{};\s]'.format(HMINUS, MINUS, FDASH, NDASH, MDASH)
         if self.__soup is not None:
             if (bodies := self.__soup.findChildren('body')) is not None:
                 for body in bodies:
@@ -1089,12 +1315,9 @@ class PureFb2:
                                     title.find('p') is not None:
                                 for paragraph in title.findChildren('p'):
                                     paragraph = normalize_text(paragraph.text, True)
-                                    if match := re.search(
-                                            rf'^((?:часть|глава|том|книга|раздел|арка)){ANYSP}*?((?:\d+\.?)+){TITLE_SEPARATOR}+(.+)$',
-                                            paragraph, re.IGNORECASE | re.MULTILINE):
+                                    if match := SECTION_TITLE_PATTERN.search(paragraph):
                                         paragraphs.append(f'{match.group(1).capitalize()} {match.group(2).rstrip(".")}')
-                                        paragraphs.append(re.sub(
-                                            r'^(["«\']?)(\w)(.*)$',
+                                        paragraphs.append(TITLE_LETTER_PATTERN.sub(
                                             lambda mo: f'{mo.group(1)}{mo.group(2).capitalize()}{mo.group(3)}',
                                             match.group(3)
                                         ))
@@ -1102,16 +1325,16 @@ class PureFb2:
                                     else:
                                         paragraphs.append(paragraph)
                                 if len(paragraphs):
-                                    clear_tags(title, 'p')
+                                    clear_tags(title, 'p', False)
                                     insert_tags(self.__soup, title, 'p', paragraphs, 1)
 
     def __get_last_chapter_title(self) -> str:
         section = []
         if self.__soup is not None:
-            if (sections := self.__soup.find('body').findChildren('section')) is not None:
-                index = -1 if sections[-1].findChild('title') is not None and \
-                              sections[-1].findChild('title').find('p') is not None and \
-                              sections[-1].findChild('title').find('p').text.strip() != 'Nota bene' else -2
+            if (sections := self.__get_sections()) is not None:
+                last_title = sections[-1].findChild('title')
+                last_p = last_title.find('p') if last_title is not None else None
+                index = -1 if last_p is not None and last_p.text.strip() != 'Nota bene' else -2
                 if len(sections) >= abs(index) and \
                         (title := sections[index].findChild('title')) is not None and \
                         (paragraphs := title.findChildren('p')) is not None:
@@ -1122,14 +1345,16 @@ class PureFb2:
     def __get_chapters(self, root_section: list = None) -> list | None:
         chapters = []
         if root_section is None:
-            root_section = self.__soup.find('body')
+            root_section = self.__get_body()
         if self.__soup is not None:
-            for section in self.__soup.find('body').findChildren('section'):
-                if root_section == section.find_parent():
-                    chapters.append(section.findChild('title').find('p').text
-                                    if section.find('section') is None
-                                    else [section.findChild('title').find('p').text, self.__get_chapters(section)]
-                                    )
+            # walk direct children only; the old filter re-scanned every
+            # section under body once per nesting level
+            for section in root_section.find_all('section', recursive=False):
+                title = section.findChild('title').find('p').text
+                chapters.append(title
+                                if section.find('section') is None
+                                else [title, self.__get_chapters(section)]
+                                )
         return chapters if len(chapters) else None
 
     def __optimize_images(self, process: bool = True) -> None:
@@ -1139,28 +1364,48 @@ class PureFb2:
         if self.__soup is not None:
             # reconvert only new images in the future processing of this book
             self.add_custom_tag('convert-images', 'true', True)
-            for binary in self.__soup.find_all('binary'):
-                if self._convert_images is True or (self._convert_images is None and process):
-                    if binary.get('content-type') in ['image/jpg', 'image/jpeg', 'image/png']:
-                        # binary['id'] = re.sub(r'(.+?)\\.(jpeg|jpg|png)', r'\g<1>.jpg', binary.get('id'))
-                        if (image_raw := self.__optimize_image(binary.text, binary.get('content-type'),
-                                                               binary.get('id'))) is not None:
-                            binary.string = image_raw
-                            binary['content-type'] = 'image/jpg'
-                        else:
-                            if self._debug:
-                                print(f"Removed {binary.get('id')}")
-                            url_xmlns = f'{get_namespaces(self.__soup)["http://www.w3.org/1999/xlink"]}:' \
-                                if 'http://www.w3.org/1999/xlink' in get_namespaces(self.__soup) else ''
-                            for image in self.__soup.find_all('image'):
-                                if image.get(f'{url_xmlns}href') == '#' + binary.get('id'):
-                                    image.decompose()
-                            binary.decompose()
+            # <binary> tags only ever sit directly under <FictionBook>, so a
+            # non-recursive scan of the root skips the whole body text tree
+            root = self.__soup.find('FictionBook') or self.__soup
+            binaries = root.find_all('binary', recursive=False)
+            if self._convert_images is True or (self._convert_images is None and process):
+                targets = [binary for binary in binaries
+                           if binary.get('content-type') in ['image/jpg', 'image/jpeg', 'image/png']]
+                # books often embed the same payload twice (cover plus inline
+                # copy): decode/encode each distinct payload only once
+                unique: dict = {}
+                for binary in targets:
+                    unique.setdefault((binary.text, binary.get('content-type')), binary.get('id'))
+                # PIL releases the GIL while decoding/encoding, so multi-image
+                # books re-encode in parallel; a lone image skips pool overhead
+                jobs = [(text, mime, id) for (text, mime), id in unique.items()]
+                if len(jobs) > 1:
+                    with ThreadPoolExecutor() as executor:
+                        results = list(executor.map(lambda job: self.__optimize_image(*job), jobs))
                 else:
-                    # just normalizing the same image to the single base64 line
-                    binary.string = base64.b64encode(
-                        base64.b64decode(binary.text)
-                    ).decode()
+                    results = [self.__optimize_image(*job) for job in jobs]
+                optimized = dict(zip(unique, results))
+                for binary in targets:
+                    image_raw = optimized[(binary.text, binary.get('content-type'))]
+                    # binary['id'] = re.sub(r'(.+?)\\.(jpeg|jpg|png)', r'\g<1>.jpg', binary.get('id'))
+                    if image_raw is not None:
+                        binary.string = image_raw
+                        binary['content-type'] = 'image/jpg'
+                    else:
+                        if self._debug:
+                            print(f"Removed {binary.get('id')}")
+                        namespaces = self.__get_namespaces()
+                        url_xmlns = f'{namespaces["http://www.w3.org/1999/xlink"]}:' \
+                            if 'http://www.w3.org/1999/xlink' in namespaces else ''
+                        for image in self.__soup.find_all('image'):
+                            if image.get(f'{url_xmlns}href') == '#' + binary.get('id'):
+                                image.decompose()
+                        binary.decompose()
+            else:
+                for binary in binaries:
+                    # just normalizing the same image to the single base64 line;
+                    # stripping whitespace avoids the decode/encode round trip
+                    binary.string = binary.text.translate(B64_WHITESPACE_TABLE)
 
     def __optimize_image(self, raw, mime: str, id: str = '') -> Optional[bytes]:
         n_width = 640
@@ -1169,37 +1414,62 @@ class PureFb2:
         if raw:
             if mime in ['image/jpeg', 'image/jpg', 'image/png']:
                 try:
-                    with Image.open(io.BytesIO(base64.b64decode(raw))) as image:
+                    buf = base64.b64decode(raw)
+                    with Image.open(io.BytesIO(buf)) as image:
                         convert_image = False if self._convert_images is True else True
+                        if mime != 'image/png':
+                            width, height = image.size
+                            if width <= n_width and height <= n_height and \
+                                    image.mode == 'RGB' and len(buf) < 100 * 1024:
+                                # small JPEG that already fits: re-encoding
+                                # would only cost CPU and generational loss
+                                return base64.b64encode(buf).decode()
+                            if width > n_width or height > n_height:
+                                # let libjpeg decode oversized JPEGs straight to
+                                # a smaller scale; thumbnail() does the exact fit
+                                convert_image = True
+                                image.draft('RGB', (n_width, n_height))
                         if mime == 'image/png':
                             convert_image = True
                             image = image.convert('RGBA')
-                            data = image.getdata()
-                            new_data = []
-                            for item in data:
-                                if item[3] == 0:
-                                    new_data.append((239, 238, 238, 255))
-                                else:
-                                    new_data.append(item)
-                            image.putdata(new_data)
+                        width, height = image.size
+                        if width > n_width or height > n_height:
+                            convert_image = True
+                            # integer box filter first: a cheap C pass that
+                            # leaves thumbnail() only the final exact fit
+                            factor = min(width // n_width, height // n_height)
+                            if factor >= 2:
+                                image = image.reduce(factor)
+                            # BILINEAR is plenty ahead of a quality=70 JPEG
+                            image.thumbnail((n_width, n_height), Image.Resampling.BILINEAR)
+                        if image.mode == 'RGBA':
+                            # blend after the downscale so the composite touches
+                            # at most 640x480 pixels; fully opaque covers skip
+                            # it outright — getextrema runs in C and is cheap
+                            if image.getextrema()[3][0] < 255:
+                                # composite over a light-gray card: one C pass
+                                # that also handles semi-transparent fringes
+                                background = Image.new('RGBA', image.size, (239, 238, 238, 255))
+                                image = Image.alpha_composite(background, image)
                             # image = image.convert('RGB')
                         if image.mode != 'RGB':
                             convert_image = True
                             image = image.convert('RGB')
-                        width, height = image.size
-                        if width > n_width or height > n_height:
-                            convert_image = True
-                            image.thumbnail((n_width, n_height))
                         if convert_image:
                             if self._debug:
                                 print(f'{id} {image.mode} {mime}')
-                            stream = io.BytesIO()
+                            if (stream := getattr(self.__streams, 'stream', None)) is None:
+                                self.__streams.stream = stream = io.BytesIO()
+                            else:
+                                stream.seek(0)
+                                stream.truncate()
                             image.save(stream, format="JPEG", subsampling=2, quality=70)
                             # image.save(stream, format="JPEG", subsampling=2, quality='medium')
-                            raw = stream.getvalue()
+                            # encode straight off the scratch buffer:
+                            # getbuffer() skips the full copy getvalue() makes
+                            raw = base64.b64encode(stream.getbuffer()).decode()
                         else:
-                            raw = base64.b64decode(raw)
-                        raw = base64.b64encode(raw).decode()
+                            raw = base64.b64encode(buf).decode()
                 except EnvironmentError as err:
                     if self._debug:
                         print(f'Image Error: {err}')
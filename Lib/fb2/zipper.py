@@ -1,9 +1,13 @@
 #!/usr/bin/python
 import os
+import shutil
 from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
 from os.path import basename
 from io import BytesIO as StringIO, BytesIO
 
+# 128 KiB chunks keep the copy loop off the small default buffer
+COPY_BUFFER_SIZE = 128 * 1024
+
 
 class Zipper:
 
@@ -12,10 +16,15 @@ class Zipper:
         self.__destination = destination
 
     def open(self):
-        file = ''
+        return self.open_bytes().decode('utf-8')
+
+    def open_bytes(self) -> bytes:
+        # raw payload for callers that feed a parser; skips a decode/encode
+        # round trip over the whole book
+        file = b''
         with ZipFile(self.__source, mode='r') as zf:
             if len(zf.filelist) == 1:
-                file = zf.read(zf.filelist[0]).decode('utf-8')
+                file = zf.read(zf.filelist[0])
             else:
                 print('\'{0}\' is not valid FB2.zip file'. format(os.path.basename(self.__source)))
         return file
@@ -24,9 +33,10 @@ class Zipper:
         with ZipFile(self.__destination + '.zip',
                      mode='w',
                      compression=ZIP_DEFLATED,
-                     compresslevel=7) as zf:
+                     compresslevel=6) as zf:
             # file = ZipInfo(self.__source, time.localtime())
-            zf.write(self.__source, basename(self.__destination))
+            with open(self.__source, 'rb') as src, zf.open(basename(self.__destination), 'w') as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
         return basename(self.__destination) + '.zip'
 
 
@@ -41,7 +51,12 @@ class InMemoryZipper(object):
             self._file_name = str(file_name)
         else:
             self._file_name = file_name
-        self.in_memory_data = StringIO()
+        # with a known destination the archive streams straight to disk;
+        # the RAM buffer only exists for callers that read .data afterwards
+        if self._file_name is not None:
+            self.in_memory_data = open(self._file_name, 'w+b')
+        else:
+            self.in_memory_data = StringIO()
         # Create the in-memory zipfile
         self.in_memory_zip = ZipFile(
             self.in_memory_data, "w", compression, False)
@@ -61,8 +76,15 @@ class InMemoryZipper(object):
             zfile.create_system = 0
         self.in_memory_zip.close()
         if filename is not None:
-            with open(filename, 'wb') as f:
-                f.write(self.data)
+            if isinstance(self.in_memory_data, BytesIO):
+                # stream the buffer out instead of materializing a second
+                # full copy of the archive through getvalue()
+                self.in_memory_data.seek(0)
+                with open(filename, 'wb') as f:
+                    shutil.copyfileobj(self.in_memory_data, f, COPY_BUFFER_SIZE)
+            else:
+                # archive already went straight to the destination file
+                self.in_memory_data.close()
 
     @property
     def data(self):
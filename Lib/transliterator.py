@@ -48,6 +48,15 @@ CYR_TO_LAT_MAP = {
 
 }
 
+# str.translate handles multi-character replacements natively, so the whole
+# transliteration is a single C-level pass instead of a per-character loop
+CYR_TO_LAT_TABLE = str.maketrans(CYR_TO_LAT_MAP)
+
+# file-friendly cleanup: dropped characters go through one translate pass,
+# the dash/underscore rewrites share one alternation scan
+FRIENDLY_DROP_TABLE = str.maketrans('', '', '"\\?!@#$%^&*+|/:;[]{}<>\',')
+FRIENDLY_PATTERN = re.compile(r'(?P<dash>[-−‒–—])|[\s\\().]+')
+
 
 def to_latin(data: str = '', case: str | None = None, file_friendly_name: bool = False):
     """ Transliterate cyrillic string of characters to latin string of characters.
@@ -63,22 +72,14 @@ def to_latin(data: str = '', case: str | None = None, file_friendly_name: bool =
     elif case == 'upper':
         data = data.upper()
 
-    # Get the character per character transliteration dictionary
-    transliteration_dict = CYR_TO_LAT_MAP
-
-    # Initialize the output latin string variable
-    latinized_data = ''
+    # ASCII input has nothing to transliterate; isascii() reads a flag
+    # on the string object, so the common URL/latin-title case is free
+    if data.isascii():
+        return __file_friendly_name(data) if file_friendly_name else data
 
-    # Transliterate by traversing the input string character by character.
-    for c in data:
-        # If character is in dictionary, it means it's a cyrillic so let's transliterate that character.
-        if c in transliteration_dict:
-            # Transliterate current character.
-            latinized_data += transliteration_dict[c]
-        # If character is not in character transliteration dictionary,
-        # it is most likely a number or a special character so just keep it.
-        else:
-            latinized_data += c
+    # Transliterate in one pass; characters missing from the table
+    # (numbers, punctuation and so on) are kept as-is.
+    latinized_data = data.translate(CYR_TO_LAT_TABLE)
     # Return the transliterated string.
     if file_friendly_name:
         latinized_data = __file_friendly_name(latinized_data)
@@ -86,7 +87,6 @@ def to_latin(data: str = '', case: str | None = None, file_friendly_name: bool =
 
 
 def __file_friendly_name(data: str = '') -> str:
-    data = re.sub(r'["\\?!@#$%^&*+|/:;\[\]{}<>\',]', '', data)
-    data = re.sub(r'[{}{}{}{}{}]'.format('-', '−', '‒', '–', '—'), '-', data)
-    data = re.sub(r'[\s\\(\\)\\\.]+', '_', data)
+    data = data.translate(FRIENDLY_DROP_TABLE)
+    data = FRIENDLY_PATTERN.sub(lambda m: '-' if m.lastgroup == 'dash' else '_', data)
     return data.strip('. _')
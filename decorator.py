@@ -1,11 +1,21 @@
 # !/usr/bin/python
 
+import functools
 import re
 
 from Lib.fb2.purefb2 import PureFb2
 
 __all__ = 'decorate'
 
+NON_WORD_PATTERN = re.compile(r'\W+')
+
+
+@functools.lru_cache(maxsize=4096)
+def tagify(data: str) -> str:
+    # authors and series repeat heavily across a catalog; cache the
+    # lowered, stripped tag per raw string
+    return NON_WORD_PATTERN.sub('', data.lower())
+
 
 def decorate(fb2: PureFb2, donation: bool = False) -> str:
     tag_status = []
@@ -13,14 +23,14 @@ def decorate(fb2: PureFb2, donation: bool = False) -> str:
     authors_str = f'Автор: ' + ', '.join(fb2.authors_plain)
     authors_tag = []
     for author_plain in fb2.authors_last_name_plain:
-        authors_tag.append(re.sub(r'\W+', '', author_plain.lower()))
+        authors_tag.append(tagify(author_plain))
     tag_status.extend(authors_tag)
 
     text = f'{book_title}\n{authors_str}\n'
 
     if fb2.sequence['name']:
         text += f'Серия: {fb2.sequence["name"]} № {fb2.sequence["number"]}\n'
-        tag_sequence = re.sub(r'\W+', '', fb2.sequence["name"].lower())
+        tag_sequence = tagify(fb2.sequence["name"])
         tag_status.append(tag_sequence)
     if fb2.finished:
         tag_status.append('книгазавершена')
@@ -2,6 +2,7 @@
 
 __all__ = ('at_enabled', 'document', 'author_replaces', 'get_authors_dict', 'out_format', 'name_format')
 
+import functools
 import os
 import sqlite3
 import re
@@ -11,13 +12,18 @@ path_databases = 'c:\\dev\\projects\\python\\BatchElib2Ebook\\db\\'
 author_rename_db = os.path.join(path_databases, 'author_rename.db')
 
 
+@functools.lru_cache(maxsize=1)
+def _load_authors_dict(mtime: float) -> dict:
+    # mtime is part of the cache key, so touching the database refreshes it
+    with sqlite3.connect(author_rename_db) as db:
+        cursor = db.cursor()
+        return {item[0]: item[1] for item in cursor.execute('select * from author_rename').fetchall()}
+
+
 def get_authors_dict():
     try:
-        with sqlite3.connect(author_rename_db) as db:
-            cursor = db.cursor()
-            authors_dict = cursor.execute(f'select * from author_rename').fetchall()
-            return dict({item[0]: item[1] for item in authors_dict})
-    except EnvironmentError as err:
+        return _load_authors_dict(os.path.getmtime(author_rename_db))
+    except (EnvironmentError, sqlite3.Error) as err:
         print(f'Authors Dict Error: {err}')
         return {}
 
@@ -87,3 +93,11 @@ author_replaces = [
         ]
     }
 ]
+
+# compile the pattern strings once at import; downstream the entries run
+# through pattern.sub directly, so no book pays the parse cost again
+for _author in author_replaces:
+    _author['patterns'] = [
+        [re.compile(_pattern[0], _pattern[2] if len(_pattern) > 2 else re.NOFLAG), _pattern[1]]
+        for _pattern in _author['patterns']
+    ]
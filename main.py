@@ -1,4 +1,6 @@
 #!/usr/bin/python
+from concurrent.futures import ProcessPoolExecutor
+
 from Lib.fb2.purefb2 import PureFb2
 
 
@@ -10,10 +12,22 @@ links_i = [
 ]
 
 
-for l in links_i:
-    if l != '':
-        fb2 = PureFb2().open(l)
-        book_name = '{} - {}'.format(fb2.author_safe, fb2.title_safe)
-        print(book_name)
-        fb2.save(r'c:\Downloads\{}.fb2'.format(book_name),
-                 paragraph=True, image=True, typography=True, promo=False)
+def process_book(link: str) -> str:
+    fb2 = PureFb2().open(link)
+    book_name = '{} - {}'.format(fb2.author_safe, fb2.title_safe)
+    fb2.save(r'c:\Downloads\{}.fb2'.format(book_name),
+             paragraph=True, image=True, typography=True, promo=False)
+    return book_name
+
+
+if __name__ == '__main__':
+    # books are independent of each other, so a worker process per book
+    # sidesteps the GIL for the regex- and parser-bound pipeline
+    links = [l for l in links_i if l != '']
+    if len(links) > 1:
+        with ProcessPoolExecutor() as executor:
+            for book_name in executor.map(process_book, links):
+                print(book_name)
+    else:
+        for l in links:
+            print(process_book(l))